@@ -0,0 +1,120 @@
+import pytest
+import pandas as pd
+from wide2long import core
+from wide2long.core import convert
+
+def test_convert_duplicate_target_keeps_first_value():
+    df = pd.DataFrame({"p": [1, 2], "x": [1.0, None], "y": [None, 5.0]})
+
+    # Both sources feed (e, v): the first non-missing value is kept
+    out = convert(df, id_cols=["p"], mapping={"x": ("e", "v"), "y": ("e", "v")})
+    assert out["v"].tolist() == [1.0, 5.0]
+
+
+def test_convert_variable_name_clash():
+    df = pd.DataFrame({"p": [1, 2], "x": [1, 2]})
+
+    with pytest.raises(ValueError):
+        convert(df, id_cols=["p"], mapping={"x": ("e", "p")})
+    with pytest.raises(ValueError):
+        convert(df, id_cols=["p"], mapping={"x": ("e", "element")})
+
+
+def test_convert_preserves_non_numeric_dtypes():
+    df = pd.DataFrame({
+        "p": [1, 2],
+        "d1": pd.to_datetime(["2024-01-01", "2024-01-02"]),
+        "d2": pd.to_datetime(["2024-02-01", None]),
+        "c1": pd.Categorical(["lo", "hi"], categories=["lo", "hi"]),
+        "s1": pd.array(["a", None], dtype="string"),
+    })
+    mapping = {
+        "d1": ("e1", "when"),
+        "c1": ("e1", "level"),
+        "s1": ("e1", "note"),
+        "d2": ("e2", "when"),
+    }
+
+    out = convert(df, id_cols=["p"], mapping=mapping)
+
+    # Datetime, categorical and string variables keep their dtype
+    assert out["when"].dtype == "datetime64[ns]"
+    assert out["level"].dtype == df["c1"].dtype
+    assert out["note"].dtype == "string"
+
+    row_e2 = out[(out["element"] == "e2") & (out["p"] == 1)].iloc[0]
+    assert row_e2["when"] == pd.Timestamp("2024-02-01")
+    assert pd.isna(row_e2["level"]) and pd.isna(row_e2["note"])
+    assert out["when"].isna().tolist() == [False, False, False, True]
+
+
+def test_convert_keeps_all_missing_rows_and_columns():
+    df = pd.DataFrame({"p": [1, 2], "a_e1": [1.0, None], "b_e2": [None, None]})
+
+    out = convert(df, id_cols=["p"], mapping={"a_e1": ("e1", "a"), "b_e2": ("e2", "b")})
+
+    # All-missing (id, element) rows and variables are kept
+    assert list(out.columns) == ["p", "element", "a", "b"]
+    assert len(out) == 4 and out["b"].isna().all()
+
+    # Rows are grouped by element (mapping order), input order within each
+    assert out["element"].tolist() == ["e1", "e1", "e2", "e2"]
+    assert out["p"].tolist() == [1, 2, 1, 2]
+
+
+def test_convert_sparse_and_duplicate_extension_sources():
+    df = pd.DataFrame({
+        "p": [1, 2],
+        "a": pd.arrays.SparseArray([1.0, None]),
+        "c": pd.array(["x", None], dtype="string"),
+        "d": pd.array([None, "y"], dtype="string"),
+    })
+
+    out = convert(df, id_cols=["p"], mapping={"a": ("e1", "v"), "c": ("e2", "s"), "d": ("e2", "s")})
+
+    # Sparse sources are densified to their subtype
+    assert out["v"].dtype == "float64"
+    assert out["v"].tolist()[0] == 1.0 and out["v"].isna().tolist() == [False, True, True, True]
+
+    # Extension-dtype duplicates keep the first non-missing value
+    assert out["s"].dtype == "string"
+    assert out["s"].tolist()[2:] == ["x", "y"]
+
+
+def test_convert_threaded_arrow_strings(monkeypatch):
+    pa = pytest.importorskip("pyarrow")
+    n, n_elements = 1000, 8
+    df = pd.DataFrame({"p": range(n)})
+    for e in range(n_elements):
+        df[f"s{e}"] = pd.array([f"{e}-{i}" for i in range(n)], dtype="string[pyarrow]")
+        df[f"a{e}"] = pd.array([f"{e}-{i}" for i in range(n)], dtype=pd.ArrowDtype(pa.string()))
+        df[f"x{e}"] = range(n)
+    mapping = {}
+    for e in range(n_elements):
+        mapping[f"s{e}"] = (f"e{e}", "s")
+        mapping[f"a{e}"] = (f"e{e}", "a")
+        mapping[f"x{e}"] = (f"e{e}", "x")
+
+    # Threaded fill gives the same result as the serial one, with no values lost
+    serial = convert(df, id_cols=["p"], mapping=mapping)
+    monkeypatch.setattr(core, "_PARALLEL_MIN_CELLS", 0)
+    monkeypatch.setattr(core, "_MAX_WORKERS", 4)
+    threaded = convert(df, id_cols=["p"], mapping=mapping)
+    pd.testing.assert_frame_equal(serial, threaded)
+    assert not threaded[["s", "a", "x"]].isna().any().any()
+
+
+def test_convert_preserves_id_dtypes():
+    df = pd.DataFrame({
+        "school": pd.Categorical(["A", "B"]),
+        "person": pd.array([1, None], dtype="Int64"),
+        "x": [1, 2],
+        "y": [3, 4],
+    })
+
+    out = convert(df, id_cols=["school", "person"], mapping={"x": ("e1", "v"), "y": ("e2", "v")})
+
+    assert out["school"].dtype == df["school"].dtype
+    assert out["person"].dtype == "Int64"
+    assert out["school"].tolist() == ["A", "B", "A", "B"]
+    assert out["person"].isna().tolist() == [False, True, False, True]
@@ -0,0 +1,45 @@
+import pytest
+from wide2long.core import load_data
+
+@pytest.mark.parametrize("sep, text", [
+    (";", "school;person;pre_i1\n1;1;0\n1;2;1\n"),
+    ("::", "school::person::pre_i1\n1::1::0\n1::2::1\n"),
+    (r"\s+", "school person  pre_i1\n1 1 0\n1  2 1\n"),
+])
+def test_csv_separator(tmp_path, sep, text):
+    path = tmp_path / "wide.csv"
+    path.write_text(text, encoding="utf-8")
+
+    df = load_data(path, csv_sep=sep)
+
+    assert list(df.columns) == ["school", "person", "pre_i1"]
+    assert df["pre_i1"].tolist() == [0, 1]
+
+
+def test_csv_columns_missing_from_file(tmp_path):
+    path = tmp_path / "wide.csv"
+    path.write_text("school,person,pre_i1\n1,1,0\n1,2,1\n", encoding="utf-8")
+
+    # Only the requested columns present in the file are read
+    df = load_data(path, columns=["person", "pre_i1", "nope"])
+    assert list(df.columns) == ["person", "pre_i1"]
+
+
+def test_csv_short_row(tmp_path):
+    path = tmp_path / "wide.csv"
+    path.write_text("id,x\n1,2\n3\n", encoding="utf-8")
+
+    # The default parser fills missing trailing fields with NaN
+    df = load_data(path)
+    assert df["id"].tolist() == [1, 3]
+    assert df["x"].isna().tolist() == [False, True]
+
+
+def test_csv_pyarrow_engine_opt_in(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "wide.csv"
+    path.write_text("school,person,pre_i1\n1,1,0\n1,2,1\n", encoding="utf-8")
+
+    df = load_data(path, columns=["person", "pre_i1"], csv_engine="pyarrow")
+    assert list(df.columns) == ["person", "pre_i1"]
+    assert df["pre_i1"].tolist() == [0, 1]
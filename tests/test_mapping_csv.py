@@ -1,3 +1,4 @@
+import pytest
 import pandas as pd
 from wide2long.core import load_mapping, convert
 
@@ -29,6 +30,10 @@ def test_csv_mapping(tmp_path):
     # Columns present
     assert set(out.columns) == {"school", "person", "element", "pre", "pst", "k1", "k2"}
 
+    # Plain long-form frame: default index, unnamed columns axis
+    assert isinstance(out.index, pd.RangeIndex) and len(out) == 3
+    assert out.columns.name is None
+
     # Elements present
     assert set(out["element"]) == {"i1", "l1", "l2"}
 
@@ -46,3 +51,47 @@ def test_csv_mapping(tmp_path):
     row_l2 = out[out["element"] == "l2"].iloc[0]
     assert row_l2["k1"] == 0
     assert pd.isna(row_l2["k2"]) and pd.isna(row_l2["pre"]) and pd.isna(row_l2["pst"])
+
+
+def test_csv_mapping_conflict(tmp_path):
+    csv_text = """source_col,element_id,variable_col
+    pre_i1,i1,pre
+    pre_i1,i2,pre
+    """
+    mpath = tmp_path / "csv_mapping_conflict.csv"
+    mpath.write_text(csv_text, encoding="utf-8")
+
+    # Conflicting targets raise by default
+    with pytest.raises(ValueError):
+        load_mapping(mpath)
+
+    # Last mapping wins without validation
+    selections = load_mapping(mpath, validate=False)
+    assert selections == {"pre_i1": ("i2", "pre")}
+
+
+def test_csv_mapping_preserves_dtypes(tmp_path):
+    df = pd.DataFrame({
+        "person": [1, 2],
+        "pre_i1": pd.Series([1, 0], dtype="int32"),
+        "l1_k1" : [0.5, None],
+        "l1_k2" : ["a", "b"],
+    })
+
+    csv_text = """source_col,element_id,variable_col
+    pre_i1,i1,pre
+    l1_k1,l1,k1
+    l1_k2,l1,k2
+    """
+    mpath = tmp_path / "csv_mapping_dtypes.csv"
+    mpath.write_text(csv_text, encoding="utf-8")
+
+    out = convert(df, id_cols=["person"], mapping=load_mapping(mpath))
+
+    # Integers stay integers (nullable), floats and strings keep their dtype
+    assert out["pre"].dtype == "Int32"
+    assert out["k1"].dtype == "float64"
+    assert out["k2"].dtype == object
+
+    row_l1 = out[(out["element"] == "l1") & (out["person"] == 2)].iloc[0]
+    assert pd.isna(row_l1["pre"]) and pd.isna(row_l1["k1"]) and row_l1["k2"] == "b"
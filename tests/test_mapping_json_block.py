@@ -1,5 +1,6 @@
 import json
 import pandas as pd
+from wide2long import core
 from wide2long.core import load_mapping, convert
 
 def test_json_block_style(tmp_path):
@@ -42,4 +43,49 @@ def test_json_block_style(tmp_path):
     row_j1 = out[out["element"] == "j1"].iloc[0]
     row_j2 = out[out["element"] == "j2"].iloc[0]
     assert row_j1["k1"] == 2
-    assert row_j2["k1"] == 3
\ No newline at end of file
+    assert row_j2["k1"] == 3
+
+def test_json_block_style_threaded(tmp_path, monkeypatch):
+    df = pd.DataFrame({
+        "person": range(50),
+        "pre_i1": range(50),
+        "pst_i1": [float(i) for i in range(50)],
+        "j1_k1" : [str(i) for i in range(50)],
+        "j2_k1" : [str(-i) for i in range(50)]
+    })
+
+    mapping = {
+        "block_a": [
+            {"source_col": "pre_i1", "element_id": "i1", "variable_col": "pre"},
+            {"source_col": "pst_i1", "element_id": "i1", "variable_col": "pst"}
+        ],
+        "block_b": [
+            {"source_col": "j1_k1", "element_id": "j1", "variable_col": "k1"},
+            {"source_col": "j2_k1", "element_id": "j2", "variable_col": "k1"}
+        ]
+    }
+
+    mpath = tmp_path / "json_block_mapping.json"
+    mpath.write_text(json.dumps(mapping), encoding="utf-8")
+    selections = load_mapping(mpath)
+
+    # Threaded fill gives the same result as the serial one
+    serial = convert(df, id_cols=["person"], mapping=selections)
+    monkeypatch.setattr(core, "_PARALLEL_MIN_CELLS", 0)
+    monkeypatch.setattr(core, "_MAX_WORKERS", 4)
+    threaded = convert(df, id_cols=["person"], mapping=selections)
+    pd.testing.assert_frame_equal(serial, threaded)
+
+
+def test_json_block_style_empty_first_block(tmp_path):
+    mapping = {
+        "block_a": [],
+        "block_b": [
+            {"source_col": "j1_k1", "element_id": "j1", "variable_col": "k1"}
+        ]
+    }
+
+    mpath = tmp_path / "json_block_mapping.json"
+    mpath.write_text(json.dumps(mapping), encoding="utf-8")
+
+    assert load_mapping(mpath) == {"j1_k1": ("j1", "k1")}
@@ -1,3 +1,4 @@
+import os
 import json
 import pandas as pd
 from wide2long.core import load_mapping, convert
@@ -47,4 +48,25 @@ def test_json_key_value_style(tmp_path):
     # l2 row: k1 filled, k2 missing, pre/pst empty
     row_l2 = out[out["element"] == "l2"].iloc[0]
     assert row_l2["k1"] == 0 and pd.isna(row_l2["k2"])
-    assert pd.isna(row_l2["pre"]) and pd.isna(row_l2["pst"])
\ No newline at end of file
+    assert pd.isna(row_l2["pre"]) and pd.isna(row_l2["pst"])
+
+def test_json_key_value_reload_after_edit(tmp_path):
+    mpath = tmp_path / "json_key_value_mapping.json"
+    mpath.write_text(json.dumps({"pre_i1": ["i1", "pre"]}), encoding="utf-8")
+    assert load_mapping(mpath) == {"pre_i1": ("i1", "pre")}
+
+    # Returned mapping is a fresh dict; mutating it does not affect later loads
+    load_mapping(mpath)["pst_i1"] = ("i1", "pst")
+    assert load_mapping(mpath) == {"pre_i1": ("i1", "pre")}
+
+    # Editing the file (newer mtime) is picked up
+    mpath.write_text(json.dumps({"pre_i1": ["i2", "pre"]}), encoding="utf-8")
+    st = mpath.stat()
+    os.utime(mpath, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert load_mapping(mpath) == {"pre_i1": ("i2", "pre")}
+
+    # A rewrite within the same mtime tick is picked up if the size changed
+    st = mpath.stat()
+    mpath.write_text(json.dumps({"pre_i1": ["i22", "pre"]}), encoding="utf-8")
+    os.utime(mpath, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert load_mapping(mpath) == {"pre_i1": ("i22", "pre")}
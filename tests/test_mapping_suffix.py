@@ -0,0 +1,7 @@
+import pytest
+from wide2long.core import load_mapping
+
+def test_mapping_unsupported_suffix(tmp_path):
+    # Unsupported suffix is reported even if the file does not exist
+    with pytest.raises(ValueError):
+        load_mapping(tmp_path / "missing.txt")
@@ -1,7 +1,22 @@
 import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Dict, List, Tuple, Iterable
+from typing import Dict, List, Mapping, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON mapping parsing
+    orjson = None
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # optional: Parquet schema lookup
+    pq = None
 
 ColMap = Dict[
     str,     # column name in wide data
@@ -12,10 +27,15 @@ ColMap = Dict[
 ]
 REQUIRED_KEYS = {"source_col", "element_id", "variable_col"}
 
+# Below this many copied cells, thread start-up costs more than it saves
+_PARALLEL_MIN_CELLS = 1_000_000
+# Upper bound on threads used to fill the output
+_MAX_WORKERS = os.cpu_count() or 1
+
 def convert(
     df: pd.DataFrame,
     id_cols: List[str],
-    mapping: Iterable[ColMap],
+    mapping: Mapping[str, Tuple[str, str]],
     *,
     validate: bool = True
 ) -> pd.DataFrame:
@@ -26,92 +46,196 @@ def convert(
     Args:
         df:         Input wide data.
         id_cols:    Columns to use as identifiers (e.g., school, person)
-        mapping:    List of dictionaries for mapping columns in the 
-                    wide data to processed data
-        validate:   If True, raise an error if the same wide-data column is 
-                    mapped to different (element_id, variable_col) pairs.
+        mapping:    Dictionary mapping columns in the wide data to
+                    (element_id, variable_col) pairs in the processed data
+        validate:   If True, raise an error if selected or id columns are
+                    not in the DataFrame.
     """
-    
-    # Merge column selections
-    colmap: ColMap = {}
-    for m in mapping:
-        for k, v in m.items():
-            if validate and k in colmap and colmap[k] != v:
-                raise ValueError(f"Column '{k}' was mapped to different targets: {colmap[k]} vs {v}.")
-            colmap[k] = v
-    if not colmap:
+    if not mapping:
         raise ValueError("No columns were selected.")
 
+    # Group selected columns by element and collect each variable's source
+    # dtypes, checking that the columns exist in the same pass
+    df_cols = frozenset(df.columns)
+    by_element: Dict[str, List[Tuple[str, str]]] = {}
+    src_dtypes: Dict[str, List] = {}
+    first_src: Dict[str, str] = {}
+    missing = []
+    for src, (elt, tgt) in mapping.items():
+        if validate and src not in df_cols:
+            missing.append(src)
+            continue
+        by_element.setdefault(elt, []).append((src, tgt))
+        src_dtypes.setdefault(tgt, []).append(df[src].dtype)
+        first_src.setdefault(tgt, src)
+
     # Do sanity checks
     if validate:
-        missing = [c for c in colmap if c not in df.columns]
         if missing:
             raise KeyError(f"Selected columns not in DataFrame: {missing}.")
         for c in id_cols:
-            if c not in df.columns:
+            if c not in df_cols:
                 raise KeyError(f"id column '{c}' not in DataFrame.")
 
-    # Create helper map
-    helper_map = {src: f"__H__{elt}|{tgt}" for src, (elt, tgt) in colmap.items()}
-    df_helper = df.rename(columns=helper_map)
+    elements = list(by_element)
+    variables = sorted(src_dtypes)
 
-    # Pivot data from wide to long
-    df_helper_long = df_helper.melt(
-        id_vars=id_cols,
-        value_vars=list(helper_map.values()),
-        var_name="__h",
-        value_name="value"
-    )
+    # Variables must not overwrite the id or element columns
+    clashes = [v for v in variables if v in id_cols or v == "element"]
+    if clashes or "element" in id_cols:
+        raise ValueError(
+            f"Variable columns {clashes} clash with id columns or 'element'."
+            if clashes else "id columns cannot include 'element'."
+        )
+    n = len(df)
+    n_out = n * len(elements)
 
-    # Add 'element' col + cols for variables
-    parts = (
-        df_helper_long["__h"]
-        .str.replace("^__H__", "", regex=True)
-        .str.split("|", n=1, expand=True)
-        .rename(columns={0: "element", 1: "__col"})
-    )
-    df_helper_long = pd.concat([df_helper_long[id_cols], parts, df_helper_long["value"]], axis=1)
+    # Tile id columns (by position, keeping their dtype) and repeat element
+    # labels: one block of n rows per element
+    id_rows = np.tile(np.arange(n), len(elements))
+    ids = {c: df[c].array.take(id_rows) for c in id_cols}
+    element = pd.Categorical.from_codes(np.repeat(np.arange(len(elements)), n), categories=elements)
 
-    # Pivot again
-    out = (df_helper_long
-           .pivot_table(values="value",
-                        index=id_cols + ["element"],
-                        columns="__col",
-                        aggfunc="first")
-           .reset_index()
-           .rename_axis(None, axis=1))
+    # Allocate variable columns in their sources' common dtype. Integer and
+    # boolean variables get a mask (nullable Int/boolean) instead of being
+    # widened to float; other non-float dtypes (datetime, categorical,
+    # string, ...) are assembled as pandas arrays further below. Rows of
+    # elements without that variable stay missing.
+    storage = {tgt: _storage_dtype(src_dtypes[tgt]) for tgt in variables}
+    masks = {tgt: np.ones(n_out, dtype=bool) for tgt in variables if storage[tgt].kind in "iub"}
+    arrays = {
+        tgt for tgt in variables
+        if tgt not in masks and storage[tgt] != object and storage[tgt].kind not in "fc"
+    }
+    values = {
+        tgt: np.zeros(n_out, dtype=storage[tgt]) if tgt in masks
+        else None if tgt in arrays
+        else np.full(n_out, np.nan, dtype=storage[tgt])
+        for tgt in variables
+    }
 
-    return out
+    def fill(k: int, elt: str) -> None:
+        rows = slice(k * n, (k + 1) * n)
+        filled = set()
+        for src, tgt in by_element[elt]:
+            if tgt in arrays:
+                continue
+            s = df[src]
+            if tgt in masks:
+                new = s.to_numpy(dtype=storage[tgt], na_value=0)
+            elif storage[tgt] == object:
+                new = s.to_numpy()
+            else:
+                new = s.to_numpy(dtype=storage[tgt], na_value=np.nan)
+            if tgt in filled:
+                # Several sources for one (element, variable): only fill rows
+                # that are still missing, so the first non-missing value wins
+                dest_na = masks[tgt][rows] if tgt in masks else pd.isna(values[tgt][rows])
+                pos = np.flatnonzero(dest_na & ~s.isna().to_numpy())
+                values[tgt][k * n + pos] = new[pos]
+                if tgt in masks:
+                    masks[tgt][k * n + pos] = False
+            else:
+                values[tgt][rows] = new
+                if tgt in masks:
+                    masks[tgt][rows] = s.isna().to_numpy()
+                filled.add(tgt)
 
+    # Elements write disjoint row ranges of NumPy buffers only (pandas-array
+    # variables are assembled separately below, since e.g. Arrow arrays
+    # rebuild themselves on assignment), so large inputs are filled in
+    # threads (NumPy releases the GIL for the copies)
+    workers = min(_MAX_WORKERS, len(elements))
+    if workers > 1 and n * len(mapping) >= _PARALLEL_MIN_CELLS:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            list(ex.map(fill, range(len(elements)), elements))
+    else:
+        for k, elt in enumerate(elements):
+            fill(k, elt)
+
+    # Build each pandas-array variable once: every element contributes its
+    # source column (first non-missing value across duplicate sources) or an
+    # all-missing filler, and the pieces are concatenated
+    array_srcs: Dict[str, Dict[str, List[str]]] = {tgt: {} for tgt in arrays}
+    for src, (elt, tgt) in mapping.items():
+        if tgt in arrays:
+            array_srcs[tgt].setdefault(elt, []).append(src)
+    for tgt, srcs_by_elt in array_srcs.items():
+        filler = pd.Series(df[first_src[tgt]].array.take(np.full(n, -1), allow_fill=True))
+        pieces = []
+        for elt in elements:
+            srcs = srcs_by_elt.get(elt)
+            if not srcs:
+                pieces.append(filler)
+                continue
+            s = df[srcs[0]]
+            for src in srcs[1:]:
+                s = s.where(s.notna(), df[src])
+            pieces.append(s)
+        values[tgt] = pd.concat(pieces, ignore_index=True).array
+
+    # Wrap masked integer/boolean buffers as nullable arrays
+    for tgt, mask in masks.items():
+        array_cls = pd.arrays.BooleanArray if storage[tgt].kind == "b" else pd.arrays.IntegerArray
+        values[tgt] = array_cls(values[tgt], mask)
+
+    # Arrays are freshly allocated, so hand them over without copying; this
+    # keeps one contiguous 1D buffer per column instead of a consolidated 2D block.
+    # The result already has a RangeIndex and an unnamed columns axis.
+    return pd.DataFrame({**ids, "element": element, **values}, copy=False)
 
-def _is_block_style_named(d: dict) -> bool:
-    # {"block_a": [ {source_col, element_id, variable_col}, ... ], ...}
-    return (
-        isinstance(d, dict)
-        and len(d) > 0
-        and all(
-            isinstance(v, list) and
-            all(isinstance(item, dict) and REQUIRED_KEYS.issubset(item) for item in v)
-            for v in d.values()
-        )
-    )
 
-def _is_key_value_style(d: dict) -> bool:
+def _storage_dtype(dtypes: List):
+    # Common NumPy dtype of numeric sources; otherwise the sources' shared
+    # dtype (datetime, categorical, string, ...), or object if they differ
+    if not all(pd.api.types.is_numeric_dtype(dt) for dt in dtypes):
+        return dtypes[0] if all(dt == dtypes[0] for dt in dtypes) else np.dtype(object)
+    try:
+        return np.result_type(*(
+            dt.subtype if isinstance(dt, pd.SparseDtype) else getattr(dt, "numpy_dtype", dt)
+            for dt in dtypes
+        ))
+    except TypeError:  # numeric extension dtype without a NumPy equivalent
+        return np.dtype(object)
+
+
+def _classify(d) -> str:
+    # Peek at the first non-empty value only; the chosen branch validates the rest
+    if not isinstance(d, dict) or not d:
+        return "unknown"
+    first = next((v for v in d.values() if v != []), None)
+    # Only empty blocks, e.g. {"block_a": []}
+    if first is None:
+        return "block"
+    # {"block_a": [ {source_col, element_id, variable_col}, ... ], ...}
+    if isinstance(first, list) and first and isinstance(first[0], dict):
+        return "block"
     # {"pre_i1": ["i1","pre"], "pst_i1": ["i1","pst"], ...}
-    return (
-        isinstance(d, dict)
-        and len(d) > 0
-        and all(
-            isinstance(v, (list, tuple)) and len(v) == 2
-            for v in d.values()
-        )
-    )
+    if isinstance(first, (list, tuple)) and len(first) == 2 and not isinstance(first[0], dict):
+        return "kv"
+    return "unknown"
+
+
+def _norm(x) -> str:
+    # Skip the str() copy for values that are already strings (the common
+    # case); interning shares the repeated element/variable labels
+    return sys.intern(x.strip() if type(x) is str else str(x).strip())
+
 
+def _add_selection(colmap: ColMap, src: str, ele: str, var: str, validate: bool) -> None:
+    if validate and src in colmap and colmap[src] != (ele, var):
+        raise ValueError(f"Column '{src}' was mapped to different targets: {colmap[src]} vs {(ele, var)}.")
+    colmap[src] = (ele, var)
 
-def load_mapping(mapping_path: Path | str):
+
+def load_mapping(mapping_path: Path | str, *, validate: bool = True) -> ColMap:
     """
     Load a mapping file that describes how to reshape wide → long.
 
+    If validate is True, raise an error if the same wide-data column is
+    mapped to different (element_id, variable_col) pairs; otherwise the
+    last mapping wins.
+
     Support one of the following specification formats:
       1) CSV with columns: source_col, element_id, variable_col
       2) JSON:
@@ -126,73 +250,158 @@ def load_mapping(mapping_path: Path | str):
     if isinstance(mapping_path, str):
         mapping_path = Path(mapping_path)
 
-    if mapping_path.suffix.lower() == ".csv":
-        mdf = pd.read_csv(mapping_path, encoding="utf-8")
-        required = set(REQUIRED_KEYS)
-        if not required.issubset(mdf.columns):
-            raise ValueError(f"Mapping CSV must have columns: {sorted(required)}.")
-        # strip whitespace from the three columns
-        for col in ["source_col", "element_id", "variable_col"]:
-            mdf[col] = mdf[col].astype(str).str.strip()
-        return [{row.source_col: (row.element_id, row.variable_col)} for _, row in mdf.iterrows()]
-
-
-    if mapping_path.suffix.lower() == ".json":
-        _mjson = mapping_path.read_text(encoding="utf-8")
-        mjson = json.loads(_mjson)
-        selections: List[ColMap] = []
-
-        # (A) Block style with named blocks: content must be a list of dicts
-        if _is_block_style_named(mjson):
-            for block_name, block in mjson.items():
-                for row in block:
-                    src = str(row["source_col"]).strip()
-                    ele = str(row["element_id"]).strip()
-                    var = str(row["variable_col"]).strip()
-                    selections.append({src: (ele, var)})
-            return selections
-
-        # (B) Key–value style: { "source_col": ["element_id","variable_col"], ... }
-        if _is_key_value_style(mjson):
-            for k, v in mjson.items():
-                if not (isinstance(v, (list, tuple)) and len(v) == 2):
-                    raise ValueError("Key–value JSON mapping values must be [element_id, variable_col]")
-                src = str(k).strip()
-                ele = str(v[0]).strip()
-                var = str(v[1]).strip()
-                selections.append({src: (ele, var)})
-            return selections
-        
-        raise ValueError(
-            "Unrecognized JSON mapping format. Expected either named blocks "
-            '({"block_a": [ {...}, ... ]}) '
-            'or key-value style ({"pre_i1": ["i1","pre"], ...}).'
-        )
+    if mapping_path.suffix.lower() not in _MAPPING_LOADERS:
+        raise ValueError("Mapping must be .csv or .json")
+
+    # Key the cache on modification time and size so edited files are re-read
+    resolved = mapping_path.resolve()
+    st = resolved.stat()
+    items = _load_mapping_cached(str(resolved), st.st_mtime_ns, st.st_size, validate)
+    return dict(items)
+
+
+@lru_cache(maxsize=64)
+def _load_mapping_cached(
+    path_str: str, mtime_ns: int, size: int, validate: bool
+) -> Tuple[Tuple[str, Tuple[str, str]], ...]:
+    # Frozen to a tuple so callers cannot mutate the cached mapping
+    return tuple(_read_mapping(Path(path_str), validate).items())
 
-    raise ValueError("Mapping must be .csv or .json")
+
+def _read_mapping(mapping_path: Path, validate: bool) -> ColMap:
+    return _MAPPING_LOADERS[mapping_path.suffix.lower()](mapping_path, validate)
+
+
+def _read_mapping_csv(mapping_path: Path, validate: bool) -> ColMap:
+    cols = ["source_col", "element_id", "variable_col"]
+    mdf = pd.read_csv(
+        mapping_path,
+        encoding="utf-8",
+        dtype={c: str for c in cols},
+        keep_default_na=False,
+    )
+    required = set(REQUIRED_KEYS)
+    if not required.issubset(mdf.columns):
+        raise ValueError(f"Mapping CSV must have columns: {sorted(required)}.")
+    # strip whitespace from the three columns (read as str, no casting)
+    mdf = mdf[cols].apply(lambda s: s.str.strip())
+    src = mdf["source_col"].to_numpy()
+    ele = mdf["element_id"].to_numpy()
+    var = mdf["variable_col"].to_numpy()
+    colmap: ColMap = {}
+    for s, e, v in zip(src, ele, var):
+        _add_selection(colmap, s, e, v, validate)
+    return colmap
+
+
+def _read_mapping_json(mapping_path: Path, validate: bool) -> ColMap:
+    _mjson = mapping_path.read_bytes()
+    mjson = orjson.loads(_mjson) if orjson is not None else json.loads(_mjson)
+    kind = _classify(mjson)
+    colmap: ColMap = {}
+
+    # (A) Block style with named blocks: content must be a list of dicts
+    if kind == "block":
+        for block_name, block in mjson.items():
+            if not isinstance(block, list):
+                raise ValueError(f"Block '{block_name}' must be a list of rows")
+            for row in block:
+                _check_row_keys(row, block_name)
+                src = _norm(row["source_col"])
+                ele = _norm(row["element_id"])
+                var = _norm(row["variable_col"])
+                _add_selection(colmap, src, ele, var, validate)
+        return colmap
+
+    # (B) Key–value style: { "source_col": ["element_id","variable_col"], ... }
+    if kind == "kv":
+        for k, v in mjson.items():
+            if not (isinstance(v, (list, tuple)) and len(v) == 2):
+                raise ValueError("Key–value JSON mapping values must be [element_id, variable_col]")
+            src = _norm(k)
+            ele = _norm(v[0])
+            var = _norm(v[1])
+            _add_selection(colmap, src, ele, var, validate)
+        return colmap
+
+    raise ValueError(
+        "Unrecognized JSON mapping format. Expected either named blocks "
+        '({"block_a": [ {...}, ... ]}) '
+        'or key-value style ({"pre_i1": ["i1","pre"], ...}).'
+    )
+
+
+_MAPPING_LOADERS = {".csv": _read_mapping_csv, ".json": _read_mapping_json}
 
 
 def _check_row_keys(row: dict, block_name: str) -> None:
+    if not isinstance(row, dict):
+        raise ValueError(f"Block '{block_name}' has rows that are not objects")
     needed = {"source_col", "element_id", "variable_col"}
     if not needed.issubset(row):
         missing = sorted(needed - set(row))
         raise ValueError(f"Block '{block_name}' has rows missing keys: {missing}")
 
 
-def load_data(path: Path, csv_sep: str = ",") -> pd.DataFrame:
-    if path.suffix.lower() == ".csv":
-        df = pd.read_csv(path, encoding="utf-8", sep=csv_sep)
-        return df
-    if path.suffix.lower() in [".parquet", ".pq"]:
-        return pd.read_parquet(path)
-    raise ValueError(f"Unsupported input format: {path.suffix} (use .csv or .parquet).")
+def _read_csv(
+    path: Path, csv_sep: str, columns: List[str] | None, csv_engine: str | None
+) -> pd.DataFrame:
+    # Regex or multi-character separators need the python engine
+    engine = csv_engine if len(csv_sep) == 1 else "python"
+    if columns is not None:
+        # pyarrow cannot read just the header (nrows)
+        header = pd.read_csv(
+            path, encoding="utf-8", sep=csv_sep, nrows=0,
+            engine=None if engine == "pyarrow" else engine,
+        ).columns
+        columns = _present(columns, header)
+    return pd.read_csv(path, encoding="utf-8", sep=csv_sep, engine=engine, usecols=columns)
+
+
+def _read_parquet(
+    path: Path, csv_sep: str, columns: List[str] | None, csv_engine: str | None
+) -> pd.DataFrame:
+    if columns is not None and pq is not None:
+        columns = _present(columns, pq.read_schema(path).names)
+    return pd.read_parquet(path, columns=columns)
+
+
+def _present(columns: List[str], available) -> List[str]:
+    # Requested columns the file lacks are skipped, so convert reports them
+    # with its usual "not in DataFrame" errors
+    available = frozenset(available)
+    return [c for c in columns if c in available]
+
+
+def _write_csv(df: pd.DataFrame, path: Path) -> None:
+    df.to_csv(path, index=False)
+
+
+def _write_parquet(df: pd.DataFrame, path: Path) -> None:
+    df.to_parquet(path, index=False)
+
+
+_READERS = {".csv": _read_csv, ".parquet": _read_parquet, ".pq": _read_parquet}
+_WRITERS = {".csv": _write_csv, ".parquet": _write_parquet, ".pq": _write_parquet}
+
+
+def load_data(
+    path: Path,
+    csv_sep: str = ",",
+    columns: List[str] | None = None,
+    csv_engine: str | None = None,
+) -> pd.DataFrame:
+    # Only read `columns` (all columns if None). `csv_engine` is passed to
+    # pd.read_csv; "pyarrow" parses in parallel but is stricter (e.g. it
+    # rejects short rows), so it is opt-in.
+    reader = _READERS.get(path.suffix.lower())
+    if reader is None:
+        raise ValueError(f"Unsupported input format: {path.suffix} (use .csv or .parquet).")
+    return reader(path, csv_sep, columns, csv_engine)
 
 
 def save_data(df: pd.DataFrame, path: Path):
-    if path.suffix.lower() == ".csv":
-        df.to_csv(path, index=False)
-    elif path.suffix.lower() in [".parquet", ".pq"]:
-        df.to_parquet(path, index=False)
-    else:
+    writer = _WRITERS.get(path.suffix.lower())
+    if writer is None:
         raise ValueError(f"Unsupported output format: {path.suffix} (use .csv or .parquet).")
-    
\ No newline at end of file
+    writer(df, path)
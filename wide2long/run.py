@@ -10,17 +10,19 @@ def run():
     ap.add_argument("--mapping"     , required= True  , type=Path, help="Mapping file (.csv or .json)")
     ap.add_argument("--id-cols"     , required= True  , nargs="+", help="ID columns to keep")
     ap.add_argument("--csv-sep"     , default = ","   ,            help="CSV delimiter for reading input data (default ',')")
+    ap.add_argument("--csv-engine"  , default = None  , choices=["c", "python", "pyarrow"], help="CSV parser for input data (default: pandas' choice; 'pyarrow' is multi-threaded)")
     ap.add_argument("--no-validate" , action="store_true",         help="Allow last mapping to override on conflicts")
     args = ap.parse_args()
 
-    df = load_data(args.input, csv_sep=args.csv_sep)
-    selections = load_mapping(args.mapping)
-
     try:
+        colmap = load_mapping(args.mapping, validate=not args.no_validate)
+        # Read only the id and mapped columns from the wide data
+        columns = list(dict.fromkeys(args.id_cols + list(colmap)))
+        df = load_data(args.input, csv_sep=args.csv_sep, columns=columns, csv_engine=args.csv_engine)
         out = convert(
             df=df,
             id_cols=args.id_cols,
-            mapping=selections,
+            mapping=colmap,
             validate=not args.no_validate,
         )
     except Exception as e: